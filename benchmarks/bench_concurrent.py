@@ -0,0 +1,158 @@
+"""
+Read/write throughput of shared dicts under thread contention.
+
+Two workloads:
+- batch: each writer repeatedly assigns one value to a whole group of keys at
+  once. Each reader fetches a whole group and checks that all its values
+  match. A mismatch is a "torn read": the reader saw a half-applied batch.
+- single: writers assign, and readers fetch, one key at a time.
+
+Compares:
+- `UtilDict`, with no locking (fast, but batches are not atomic)
+- `UtilDict` guarded by one global lock
+- `ConcurrentUtilDict` (lock striping)
+
+Run with a free-threaded build (python3.13t or later) to measure
+without the GIL.
+
+    PYTHONPATH=. python benchmarks/bench_concurrent.py --threads 8 --seconds 2
+    PYTHONPATH=. python benchmarks/bench_concurrent.py --workload single
+"""
+from __future__ import annotations
+import argparse
+import sys
+import threading
+import time
+from typing import Callable, Dict, List
+
+from dictkit import UtilDict
+from dictkit.concurrent import ConcurrentUtilDict
+
+
+class GlobalLockDict:
+    def __init__(self, data: UtilDict):
+        self.data = data
+        self.lock = threading.Lock()
+
+    def __getitem__(self, key):
+        with self.lock:
+            return self.data[key]
+
+    def __setitem__(self, key, val):
+        with self.lock:
+            self.data[key] = val
+
+
+def run(
+    make: Callable[[dict], object],
+    threads: int,
+    seconds: float,
+    n_keys: int,
+    group_size: int,
+    write_ratio: float,
+    workload: str = "batch",
+) -> Dict[str, float]:
+    keys = list(range(n_keys))
+    groups = [keys[i : i + group_size] for i in range(0, n_keys, group_size)]
+    shared = make({k: 0 for k in keys})
+
+    stop = threading.Event()
+    ops: List[int] = [0] * threads
+    torn: List[int] = [0] * threads
+    writers = max(1, round(threads * write_ratio))
+
+    def batch_writer(i: int):
+        n, value = 0, 0
+        while not stop.is_set():
+            value += 1
+            shared[groups[n % len(groups)]] = value  # type:ignore
+            n += 1
+        ops[i] = n
+
+    def batch_reader(i: int):
+        n, bad = 0, 0
+        while not stop.is_set():
+            group = shared[groups[n % len(groups)]]  # type:ignore
+            if len(set(dict.values(group))) > 1:
+                bad += 1
+            n += 1
+        ops[i], torn[i] = n, bad
+
+    def single_writer(i: int):
+        n = 0
+        while not stop.is_set():
+            shared[keys[(n * 7 + i) % n_keys]] = n  # type:ignore
+            n += 1
+        ops[i] = n
+
+    def single_reader(i: int):
+        n = 0
+        while not stop.is_set():
+            shared[keys[(n * 7 + i) % n_keys]]  # type:ignore
+            n += 1
+        ops[i] = n
+
+    if workload == "batch":
+        writer, reader = batch_writer, batch_reader
+    else:
+        writer, reader = single_writer, single_reader
+
+    workers = [
+        threading.Thread(target=writer if i < writers else reader, args=(i,))
+        for i in range(threads)
+    ]
+    for w in workers:
+        w.start()
+    time.sleep(seconds)
+    stop.set()
+    for w in workers:
+        w.join()
+
+    return {
+        "ops_per_sec": sum(ops) / seconds,
+        "torn_reads": sum(torn),
+    }
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--threads", type=int, default=8)
+    parser.add_argument("--seconds", type=float, default=1.0)
+    parser.add_argument("--keys", type=int, default=10_000)
+    parser.add_argument("--group-size", type=int, default=32)
+    parser.add_argument("--write-ratio", type=float, default=0.25)
+    parser.add_argument(
+        "--workload", choices=["batch", "single", "both"], default="both"
+    )
+    args = parser.parse_args(argv)
+
+    gil = getattr(sys, "_is_gil_enabled", lambda: True)()
+    print(f"Python {sys.version.split()[0]}, GIL {'enabled' if gil else 'disabled'}")
+    print(f"{args.threads} threads, {args.keys} keys, batches of {args.group_size}")
+
+    variants = {
+        "UtilDict (no lock)": lambda d: UtilDict(d),
+        "UtilDict + global lock": lambda d: GlobalLockDict(UtilDict(d)),
+        "ConcurrentUtilDict": lambda d: ConcurrentUtilDict(d),
+    }
+    workloads = ["batch", "single"] if args.workload == "both" else [args.workload]
+    for workload in workloads:
+        print(f"\n{workload} workload")
+        for name, make in variants.items():
+            result = run(
+                make,
+                args.threads,
+                args.seconds,
+                args.keys,
+                args.group_size,
+                args.write_ratio,
+                workload,
+            )
+            line = f"{name:<24} {result['ops_per_sec']:>12,.0f} ops/s"
+            if workload == "batch":
+                line += f"   torn reads: {result['torn_reads']:,.0f}"
+            print(line)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,86 @@
+"""
+Cold-start budget for `import dictkit`.
+
+Imports dictkit in fresh interpreters, and fails (exit code 1) if:
+- the median import time, as reported by `python -X importtime`, is over
+  the budget, or
+- `from dictkit import UtilDict` loads any heavy optional dependency.
+
+    PYTHONPATH=. python benchmarks/bench_import.py --budget-ms 30
+"""
+from __future__ import annotations
+import argparse
+import statistics
+import subprocess
+import sys
+from typing import List
+
+HEAVY_MODULES = ["pandas", "numpy", "pyarrow", "json"]
+
+STATEMENT = "from dictkit import UtilDict"
+
+
+def import_time_us() -> int:
+    """
+    Cumulative microseconds spent importing dictkit and its dependencies,
+    in a fresh interpreter.
+    """
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", STATEMENT],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    total = 0
+    for line in proc.stderr.splitlines():
+        # import time: self [us] | cumulative | imported package
+        parts = line.split("|")
+        if len(parts) != 3 or not parts[0].startswith("import time:"):
+            continue
+        name = parts[2].rstrip()
+        # Top-level entries have exactly one space of indentation. Their
+        # cumulative time includes everything they imported.
+        if name.startswith(" dictkit"):
+            total += int(parts[1])
+    return total
+
+
+def loaded_heavy_modules() -> List[str]:
+    code = (
+        f"import sys; {STATEMENT}; "
+        f"print(' '.join(m for m in {HEAVY_MODULES!r} if m in sys.modules))"
+    )
+    proc = subprocess.run(
+        [sys.executable, "-c", code], capture_output=True, text=True, check=True
+    )
+    return proc.stdout.split()
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--budget-ms", type=float, default=30.0)
+    parser.add_argument("--runs", type=int, default=7)
+    args = parser.parse_args(argv)
+
+    times = [import_time_us() / 1000 for _ in range(args.runs)]
+    median = statistics.median(times)
+    heavy = loaded_heavy_modules()
+
+    print(f"`{STATEMENT}`: median {median:.1f} ms over {args.runs} runs")
+    print(f"  min {min(times):.1f} ms, max {max(times):.1f} ms")
+    print(f"  budget {args.budget_ms:.1f} ms")
+
+    failed = False
+    if median > args.budget_ms:
+        print("FAIL: import time is over budget")
+        failed = True
+    if heavy:
+        print(f"FAIL: heavy modules loaded at import: {', '.join(heavy)}")
+        failed = True
+    if not failed:
+        print("OK")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
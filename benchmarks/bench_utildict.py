@@ -0,0 +1,188 @@
+"""
+Micro-benchmarks for UtilDict and render() hot paths, on synthetic data.
+
+Each case reports throughput (ops/sec, best of several repeats) and the peak
+memory allocated by one call (via tracemalloc). Results are compared with a
+stored baseline, and any case which got slower, or allocates more, by more
+than the threshold is flagged. The exit code is 1 when anything regressed.
+
+    PYTHONPATH=. python benchmarks/bench_utildict.py             # compare
+    PYTHONPATH=. python benchmarks/bench_utildict.py --save      # new baseline
+    PYTHONPATH=. python benchmarks/bench_utildict.py -k render   # filter cases
+
+Throughput depends on the machine, so save a baseline on the machine which
+runs the comparison.
+"""
+from __future__ import annotations
+import argparse
+import json
+import os
+import sys
+import timeit
+import tracemalloc
+from typing import Any, Callable, Dict, List, Tuple
+
+from dictkit import UtilDict
+from dictkit.render import render
+
+BASELINE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "baseline.json")
+
+SIZES = [100, 10_000]
+DEPTHS = [1, 3]
+
+
+def flat(n: int) -> Dict[str, int]:
+    return {f"k{i}": i for i in range(n)}
+
+
+def nested(n: int, depth: int) -> Dict:
+    """
+    Tree of plain dicts with about `n` leaves spread over `depth` levels.
+    Leaves alternate between numbers, strings and short lists.
+    """
+    breadth = max(2, round(n ** (1 / depth)))
+    counter = iter(range(n * 2))
+
+    def build(level: int) -> Any:
+        if level == depth:
+            i = next(counter)
+            return [i, i + 1] if i % 3 == 0 else (f"v{i}" if i % 3 == 1 else i)
+        return {f"k{i}": build(level + 1) for i in range(breadth)}
+
+    return build(0)
+
+
+def cases(n: int, depth: int) -> List[Tuple[str, Callable[[], Any]]]:
+    data = flat(n)
+    keys = list(data)
+    some = keys[::10]
+    ud = UtilDict(data)
+    pairs = list(data.items())
+    half = dict(pairs[: n // 2])
+    tree_plain = nested(n, depth)
+    tree = UtilDict(tree_plain).deep_uniform()
+    values_tuple = tuple(range(len(some)))
+
+    def setitem_tuple():
+        ud[some] = values_tuple
+
+    def setitem_broadcast():
+        ud[some] = [0]
+
+    flat_cases = [
+        ("init_dict", lambda: UtilDict(data)),
+        ("init_kwargs", lambda: UtilDict(**data)),
+        ("init_pairs", lambda: UtilDict(pairs)),
+        ("init_zip", lambda: UtilDict(keys, list(data.values()))),
+        ("init_multi", lambda: UtilDict(half, pairs[n // 2 :], extra=1)),
+        ("add", lambda: ud.add(half, extra=1)),
+        ("drop", lambda: ud.drop(some)),
+        ("copy", lambda: ud.copy()),
+        ("getitem_list", lambda: ud[some]),
+        ("setitem_list_tuple", setitem_tuple),
+        ("setitem_list_broadcast", setitem_broadcast),
+    ]
+    tree_cases = [
+        ("deep_uniform", lambda: UtilDict(tree_plain).deep_uniform()),
+        ("json", lambda: tree.json()),
+        ("render", lambda: render(tree_plain)),
+        ("repr", lambda: repr(tree)),
+    ]
+
+    named = []
+    if depth == DEPTHS[0]:
+        named += [(f"{name}[n={n}]", fn) for name, fn in flat_cases]
+    named += [(f"{name}[n={n},depth={depth}]", fn) for name, fn in tree_cases]
+    return named
+
+
+def measure(fn: Callable[[], Any], min_time: float, repeat: int) -> Dict[str, float]:
+    timer = timeit.Timer(fn)
+    number, _ = timer.autorange()
+    number = max(1, int(number * min_time / 0.2))
+    best = min(timer.repeat(repeat=repeat, number=number)) / number
+
+    tracemalloc.start()
+    try:
+        fn()
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        tracemalloc.stop()
+
+    return {"ops_per_sec": 1 / best, "peak_bytes": peak}
+
+
+def compare(
+    results: Dict[str, Dict[str, float]],
+    baseline: Dict[str, Dict[str, float]],
+    threshold: float,
+) -> List[str]:
+    regressions = []
+    for name, result in results.items():
+        base = baseline.get(name)
+        if base is None:
+            continue
+        speed = result["ops_per_sec"] / base["ops_per_sec"]
+        if speed < 1 - threshold:
+            regressions.append(f"{name}: {speed:.0%} of baseline throughput")
+        if base["peak_bytes"] and result["peak_bytes"] > base["peak_bytes"] * (
+            1 + threshold
+        ):
+            growth = result["peak_bytes"] / base["peak_bytes"]
+            regressions.append(f"{name}: {growth:.0%} of baseline allocations")
+    return regressions
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description=__doc__.split("\n\n")[0])
+    parser.add_argument("--save", action="store_true", help="write a new baseline")
+    parser.add_argument("--baseline", default=BASELINE)
+    parser.add_argument("--threshold", type=float, default=0.25)
+    parser.add_argument("--min-time", type=float, default=0.2)
+    parser.add_argument("--repeat", type=int, default=5)
+    parser.add_argument("-k", dest="pattern", default="", help="run matching cases")
+    args = parser.parse_args(argv)
+
+    results: Dict[str, Dict[str, float]] = {}
+    for n in SIZES:
+        for depth in DEPTHS:
+            for name, fn in cases(n, depth):
+                if args.pattern not in name:
+                    continue
+                results[name] = measure(fn, args.min_time, args.repeat)
+                r = results[name]
+                print(
+                    f"{name:<42} {r['ops_per_sec']:>14,.1f} ops/s"
+                    f" {r['peak_bytes'] / 1024:>12,.1f} KiB peak"
+                )
+
+    if args.save:
+        baseline = {}
+        if os.path.exists(args.baseline):
+            with open(args.baseline) as f:
+                baseline = json.load(f)
+        baseline.update(results)
+        with open(args.baseline, "w") as f:
+            json.dump(baseline, f, indent=2, sort_keys=True)
+            f.write("\n")
+        print(f"Saved baseline to {args.baseline}")
+        return 0
+
+    if not os.path.exists(args.baseline):
+        print("No baseline to compare with. Run with --save first.")
+        return 0
+
+    with open(args.baseline) as f:
+        regressions = compare(results, json.load(f), args.threshold)
+
+    if regressions:
+        print(f"\nRegressions over {args.threshold:.0%}:")
+        for line in regressions:
+            print(f"  {line}")
+        return 1
+    print(f"\nNo regressions over {args.threshold:.0%}")
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
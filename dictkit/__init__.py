@@ -1,3 +1,29 @@
 from dictkit import utildict
 
 from dictkit.utildict import UtilDict
+
+# Loaded on first access, so `import dictkit` never pulls in pandas or numpy
+# for programs that don't use the features which need them.
+_lazy_attributes = {
+    "uncategorize": "dictkit.categorize",
+    "SortedUtilDict": "dictkit.sorteddict",
+    "ConcurrentUtilDict": "dictkit.concurrent",
+    "LazyUtilDict": "dictkit.lazy",
+    "TreeIndex": "dictkit.query",
+}
+
+
+def __getattr__(name):
+    module = _lazy_attributes.get(name)
+    if module is None:
+        raise AttributeError(f"module 'dictkit' has no attribute {name!r}")
+
+    from importlib import import_module
+
+    value = getattr(import_module(module), name)
+    globals()[name] = value
+    return value
+
+
+def __dir__():
+    return sorted(set(globals()) | set(_lazy_attributes))
@@ -1,11 +1,19 @@
+import numpy as np
 import pandas as pd
 from collections import namedtuple
 from typing import (
+    Any,
+    Dict,
     List,
+    Literal,
+    Mapping,
+    Optional,
     Union,
 )
 
 from dictkit import UtilDict
+from dictkit import instrument as _instrument
+from dictkit.sorteddict import SortedUtilDict
 
 
 def categorize(
@@ -13,7 +21,12 @@ def categorize(
     by: Union[str, List[Union[str, List[str]]]],
     drop: bool = False,
     reset_index: bool = True,
-    sort_keys: bool = False,
+    sort_keys: Union[bool, Literal["index"]] = False,
+    min_size: Optional[int] = None,
+    top_n: Optional[int] = None,
+    other: Any = None,
+    columns: Optional[List[str]] = None,
+    compact: bool = False,
 ) -> UtilDict:
     """
     Break down a dataframe into a nested dictionary of filtered versions
@@ -44,8 +57,28 @@ def categorize(
         Whether to drop columns listed in `by`, for each resulting dataframe
     reset_index : bool, default True
         Reset the index of each resulting dataframe
-    sort_keys : bool, default False
-        If True, keys are placed in sorted ascending order
+    sort_keys : bool or 'index', default False
+        If True, keys are placed in sorted ascending order.
+        If 'index', each level is a `SortedUtilDict`, which keeps its keys sorted
+        as they change, and supports range slicing by key.
+    min_size : int, optional
+        At each level, skip groups with fewer rows than this.
+    top_n : int, optional
+        At each level, keep only the `top_n` largest groups. Ties go to the
+        group which appears first.
+    other : hashable, optional
+        If given, rows from groups skipped by `min_size` or `top_n` are
+        collected into one extra group under this key, placed last.
+        With `sort_keys='index'`, it is sorted with the group keys instead,
+        so it must be comparable with them.
+    columns : list[str], optional
+        Keep only these columns in each resulting dataframe. Unlisted columns
+        are removed before splitting. Unlisted columns from `by` are removed
+        right after the level that uses them.
+    compact : bool, default False
+        Before splitting, shrink columns not listed in `by`: string columns with
+        many repeated values become categoricals, and numeric columns are
+        downcast to the smallest dtype which holds their values exactly.
 
 
     Notes
@@ -54,6 +87,13 @@ def categorize(
     are in each column specified in `by`. A separate pandas filter operation will run for each
     of those values.
 
+    `min_size` and `top_n` are decided from one group-size count per level, before
+    any filtering. Skipped groups are never filtered or copied, and their
+    sub-levels are never built.
+
+    `columns` and `compact` shrink the data once, before any partition is copied,
+    so every partition is smaller and cheaper to build.
+
 
     Examples
     --------
@@ -250,6 +290,20 @@ def categorize(
              2      ohio  11     23
        }
     }
+
+    Keep only the largest groups, optionally gathering the rest under one key
+    >>> orders = pd.DataFrame({'state': ['ohio'] * 3 + ['utah'] * 2 + ['iowa'], 'sales': range(6)})
+    >>> {state: len(rows) for state, rows in categorize(orders, 'state', top_n=2).items()}
+    {'ohio': 3, 'utah': 2}
+    >>> {state: len(rows) for state, rows in categorize(orders, 'state', min_size=2, other='(other)').items()}
+    {'ohio': 3, 'utah': 2, '(other)': 1}
+
+    Project and compact the partitions
+    >>> small = categorize(df, 'color', columns=['state', 'sales'], compact=True)
+    >>> small['gray'].dtypes
+    state    category
+    sales       int16
+    dtype: object
     """
 
     def get_categories(df, field):
@@ -261,19 +315,45 @@ def categorize(
         if isinstance(unique_values, pd.Series):
             unique_values = unique_values.to_frame()
 
-        res = UtilDict()
+        other_rows = None
+        if min_size is not None or top_n is not None:
+            unique_values, other_rows = _prune_groups(
+                df, field, unique_values, min_size, top_n, other is not None
+            )
+
+        res = SortedUtilDict() if sort_keys == "index" else UtilDict()
 
         field_cls = namedtuple("Key", field, rename=True)
 
-        for x in unique_values.itertuples():
-            key = tuple(x)[1:]
-            mapping = dict(zip(field, key))
-            filtered = df
-            for k, v in mapping.items():
-                filtered = filtered[filtered[k] == v]
+        dropped = [
+            f for f in field if drop or (columns is not None and f not in columns)
+        ]
+        keep = [c for c in df.columns if c not in dropped] if dropped else None
+
+        def finish(filtered):
+            # Select the surviving columns first, so dropped ones are never copied
+            if keep is not None:
+                filtered = filtered.loc[:, keep]
             filtered = filtered.copy()
             if reset_index:
                 filtered.reset_index(drop=True, inplace=True)
+            return filtered
+
+        def partition(mapping):
+            filtered = df
+            for k, v in mapping.items():
+                filtered = filtered[filtered[k] == v]
+            return finish(filtered)
+
+        for x in unique_values.itertuples():
+            key = tuple(x)[1:]
+            mapping = dict(zip(field, key))
+            if _instrument.ENABLED:
+                _instrument.count("categorize.partitions")
+                with _instrument.timer("categorize.filter"):
+                    filtered = partition(mapping)
+            else:
+                filtered = partition(mapping)
 
             if len(key) == 1:
                 res[key[0]] = filtered
@@ -281,31 +361,285 @@ def categorize(
                 named_key = field_cls(**dict(zip(field, key)))
                 res[named_key] = filtered
 
-        if drop:
-            for gdf in res.values():
-                gdf.drop(columns=field, inplace=True)
-
-        if sort_keys:
+        if sort_keys is True:
             res = UtilDict({key: res[key] for key in list(sorted(list(res.keys())))})
 
+        if other_rows is not None and other_rows.any():
+            if other in res:
+                raise ValueError(f"`other` key {other!r} is also a group key")
+            rest = finish(df[other_rows])
+            try:
+                res[other] = rest
+            except TypeError:
+                raise TypeError(
+                    f"`other` key {other!r} can't be sorted with the group keys. "
+                    "With sort_keys='index', it must be comparable with them."
+                ) from None
+
         return res
 
-    df = df.copy()
     if not isinstance(by, list):
         by = [by]
 
+    key_columns = [
+        f for level in by for f in (level if isinstance(level, list) else [level])
+    ]
+    if columns is not None:
+        df = df[[c for c in df.columns if c in columns or c in key_columns]]
+    else:
+        df = df.copy()
+
+    if compact:
+        df = _compact(df, exclude=key_columns)
+
     curr_field = by[0]
     by = by[1:]
 
-    res = get_categories(df, curr_field)
+    if _instrument.ENABLED:
+        fields = curr_field if isinstance(curr_field, list) else [curr_field]
+        label = ",".join(str(f) for f in fields)
+        with _instrument.timer(f"categorize.level.{label}"):
+            res = get_categories(df, curr_field)
+    else:
+        res = get_categories(df, curr_field)
 
     if by:
         for k, v in res.items():
-            res[k] = categorize(v, by, drop, reset_index, sort_keys)
+            res[k] = categorize(
+                v,
+                by,
+                drop=drop,
+                reset_index=reset_index,
+                sort_keys=sort_keys,
+                min_size=min_size,
+                top_n=top_n,
+                other=other,
+                columns=columns,
+            )
 
     return res
 
 
+def _compact(df: pd.DataFrame, exclude: List[str]) -> pd.DataFrame:
+    """
+    Convert repeated string columns to categoricals, and downcast numeric
+    columns, skipping columns in `exclude`.
+    """
+    for col in df.columns:
+        if col in exclude:
+            continue
+        s = df[col]
+        if pd.api.types.is_object_dtype(s) or pd.api.types.is_string_dtype(s):
+            try:
+                n_unique = s.nunique(dropna=False)
+            except TypeError:
+                # Unhashable values, such as lists, can't be categories
+                continue
+            if n_unique <= len(s) // 2:
+                df[col] = s.astype("category")
+        elif pd.api.types.is_bool_dtype(s):
+            continue
+        elif pd.api.types.is_unsigned_integer_dtype(s):
+            df[col] = pd.to_numeric(s, downcast="unsigned")
+        elif pd.api.types.is_integer_dtype(s):
+            df[col] = pd.to_numeric(s, downcast="integer")
+        elif pd.api.types.is_float_dtype(s):
+            down = pd.to_numeric(s, downcast="float")
+            # Only keep the smaller dtype if no value lost precision
+            if down.astype(s.dtype).equals(s):
+                df[col] = down
+    return df
+
+
+def _all_equal(column: pd.Series, value) -> bool:
+    try:
+        return bool((column == value).all())
+    except (TypeError, ValueError):
+        return False
+
+
+def _prune_groups(
+    df: pd.DataFrame,
+    field: List[str],
+    unique_values: pd.DataFrame,
+    min_size: Optional[int],
+    top_n: Optional[int],
+    want_other: bool,
+):
+    """
+    Filter `unique_values` down to the groups which pass `min_size` and `top_n`,
+    using a single group-size count. Also returns a row mask for the skipped
+    groups when `want_other` is True, or None otherwise.
+    """
+    sizes = df.groupby(field, sort=False, observed=True).size()
+    if len(field) == 1:
+        counts = sizes.reindex(unique_values[field[0]]).to_numpy()
+    else:
+        counts = sizes.reindex(pd.MultiIndex.from_frame(unique_values)).to_numpy()
+
+    keep = np.ones(len(counts), dtype=bool)
+    if min_size is not None:
+        keep &= counts >= min_size
+    if top_n is not None:
+        order = np.argsort(-counts, kind="stable")
+        largest = order[keep[order]][:top_n]
+        keep = np.zeros(len(counts), dtype=bool)
+        keep[largest] = True
+
+    kept = unique_values[keep]
+    if not want_other or keep.all():
+        return kept, None
+
+    if len(field) == 1:
+        in_kept = df[field[0]].isin(kept[field[0]])
+    else:
+        in_kept = pd.MultiIndex.from_frame(df[field]).isin(
+            pd.MultiIndex.from_frame(kept)
+        )
+    return kept, ~in_kept & df[field].notna().all(axis=1)
+
+
+def uncategorize(
+    tree: Mapping,
+    by: Optional[Union[str, List[Union[str, List[str]]]]] = None,
+    restore_order: bool = False,
+) -> pd.DataFrame:
+    """
+    Inverse of `categorize()`. Flatten a nested dictionary of dataframes back
+    into a single dataframe, restoring the group keys as columns.
+
+    All leaves are collected with their key paths first, then combined with a
+    single concatenation. Key columns are built by repeating each leaf's key
+    once per row, rather than assigning them leaf by leaf.
+
+    Parameters
+    ----------
+    tree : Mapping
+        Result of `categorize()`, or any nested mapping with dataframe leaves.
+    by : str or list[str or list[str]], optional
+        Column names for each nesting level, in the same form passed to
+        `categorize()`. Levels with namedtuple keys default to the namedtuple's
+        fields. Levels with plain keys default to the leaves' column holding
+        that key (when built with `drop=False`), or else to `level_<n>`.
+    restore_order : bool, default False
+        Sort the result by the leaves' index, restoring the original row order.
+        This requires the tree to have been built with `reset_index=False`,
+        and raises ValueError if the leaves' index labels overlap.
+        Otherwise, rows are ordered leaf by leaf, and the index is reset.
+
+    Notes
+    -----
+    Key columns are placed first, in nesting order. When a leaf already contains
+    a column with the same name (`drop=False`), the existing column is kept.
+
+    Examples
+    --------
+    >>> df = pd.DataFrame({
+    ...     'color': ['red', 'gray', 'red', 'gray'],
+    ...     'meat': ['steak', 'beef', 'salmon', 'beef'],
+    ...     'sales': [53, 298, 2, 423],
+    ... })
+    >>> tree = categorize(df, ['color', 'meat'], drop=True)
+    >>> uncategorize(tree, by=['color', 'meat'])
+      color    meat  sales
+    0   red   steak     53
+    1   red  salmon      2
+    2  gray    beef    298
+    3  gray    beef    423
+
+    Without `by`, key columns kept by `drop=False` are recognised
+    >>> uncategorize(categorize(df, ['color', 'meat'])).columns.tolist()
+    ['color', 'meat', 'sales']
+
+    Composite keys restore their namedtuple fields
+    >>> tree = categorize(df, [['color', 'meat']], drop=True, reset_index=False)
+    >>> uncategorize(tree, restore_order=True)
+      color    meat  sales
+    0   red   steak     53
+    1  gray    beef    298
+    2   red  salmon      2
+    3  gray    beef    423
+    """
+    if by is not None and not isinstance(by, list):
+        by = [by]
+
+    leaves: List[pd.DataFrame] = []
+    paths: List[tuple] = []
+
+    def collect(node, path):
+        if isinstance(node, Mapping):
+            for k, v in node.items():
+                collect(v, path + (k,))
+            return
+        leaves.append(node)
+        paths.append(path)
+
+    collect(tree, ())
+
+    if not leaves:
+        return pd.DataFrame()
+
+    inferred: Dict[int, Optional[str]] = {}
+
+    def key_column(level: int) -> Optional[str]:
+        """
+        A column which every non-empty leaf still holds, with the leaf's key
+        for this level as its only value (as left by `drop=False`).
+        """
+        if level not in inferred:
+            taken = set(inferred.values())
+            candidates = None
+            for leaf, path in zip(leaves, paths):
+                if level >= len(path) or not len(leaf):
+                    continue
+                if candidates is None:
+                    candidates = [c for c in leaf.columns if c not in taken]
+                candidates = [
+                    c
+                    for c in candidates
+                    if c in leaf.columns and _all_equal(leaf[c], path[level])
+                ]
+                if not candidates:
+                    break
+            inferred[level] = candidates[0] if candidates else None
+        return inferred[level]
+
+    def level_names(level: int, key) -> List[str]:
+        names = by[level] if by is not None and level < len(by) else None
+        if names is not None and not isinstance(names, list):
+            names = [names]
+        if hasattr(key, "_fields"):
+            return list(names or key._fields)
+        return list(names or [key_column(level) or f"level_{level}"])
+
+    key_values: Dict[str, list] = {}
+    for i, path in enumerate(paths):
+        for level, key in enumerate(path):
+            values = tuple(key) if hasattr(key, "_fields") else (key,)
+            for name, value in zip(level_names(level, key), values):
+                key_values.setdefault(name, [None] * len(paths))[i] = value
+
+    data = pd.concat(leaves, ignore_index=not restore_order)
+    if restore_order and data.index.has_duplicates:
+        raise ValueError(
+            "Can't restore the original row order: leaf indexes overlap. "
+            "Build the tree with reset_index=False."
+        )
+    lengths = [len(leaf) for leaf in leaves]
+
+    position = 0
+    for name, values in key_values.items():
+        if name in data.columns:
+            continue
+        data.insert(position, name, pd.Series(values).repeat(lengths).array)
+        position += 1
+
+    if restore_order:
+        data = data.sort_index(kind="stable")
+
+    return data
+
+
 if __name__ == "__main__":
 
     from dictkit import UtilDict
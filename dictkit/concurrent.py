@@ -0,0 +1,230 @@
+from __future__ import annotations
+import threading
+from collections import abc
+from typing import Collection, List
+
+from dictkit.utildict import UtilDict
+
+DEFAULT_STRIPES = 8
+
+# Guards lazy lock creation for instances made with `__new__` (copies, subsets)
+_init_lock = threading.Lock()
+
+
+class _Held:
+    """
+    Acquires several locks on enter, and releases them in reverse on exit.
+    """
+
+    __slots__ = ("locks",)
+
+    def __init__(self, locks: List[threading.Lock]):
+        self.locks = locks
+
+    def __enter__(self):
+        acquired = 0
+        try:
+            for lock in self.locks:
+                lock.acquire()
+                acquired += 1
+        except BaseException:
+            for lock in reversed(self.locks[:acquired]):
+                lock.release()
+            raise
+        return self
+
+    def __exit__(self, *exc):
+        for lock in reversed(self.locks):
+            lock.release()
+
+
+class ConcurrentUtilDict(UtilDict):
+    """
+    A UtilDict which is safe to share between threads, including on
+    free-threaded Python builds.
+
+    Keys are spread across a fixed number of locks ("stripes") by hash.
+    Single-key operations only lock their key's stripe, so threads working
+    on different keys rarely wait for each other. Multi-key operations lock
+    every stripe involved (always in the same order), so they are atomic:
+    other threads see either none or all of a batch.
+
+    - Atomic batch set: `cd[['a', 'b']] = 1, 2`, `cd[...] = {...}`, `update()`
+    - Atomic batch drop: `cd.drop('a', 'b', inplace=True)`
+    - Consistent reads of several keys: `cd[['a', 'b']]`
+    - `snapshot()` returns a consistent point-in-time `UtilDict` copy.
+      Iteration, `keys()`, `values()`, `items()`, rendering and `json()`
+      all work from a snapshot, so they never see a half-applied batch and
+      can't fail because another thread resized the dict.
+
+    Examples
+    --------
+    >>> cd = ConcurrentUtilDict(a=1, b=2)
+    >>> cd[['a', 'b']] = 10, 20
+    >>> cd.drop('a', inplace=True)
+    >>> cd.snapshot()
+    {
+       'b': 20
+    }
+    """
+
+    def __init__(self, *args, stripes: int = DEFAULT_STRIPES, **kwargs):
+        self.__dict__["_locks"] = [threading.Lock() for _ in range(stripes)]
+        super().__init__(*args, **kwargs)
+
+    def __setstate__(self, state):
+        stripes = state.get("stripes", DEFAULT_STRIPES)
+        self.__dict__["_locks"] = [threading.Lock() for _ in range(stripes)]
+
+    def __getstate__(self):
+        # Locks can't be pickled, so only their number is kept
+        return {"stripes": len(self._stripes())}
+
+    def _stripes(self) -> List[threading.Lock]:
+        locks = self.__dict__.get("_locks")
+        if locks is None:
+            with _init_lock:
+                locks = self.__dict__.get("_locks")
+                if locks is None:
+                    locks = self.__dict__["_locks"] = [
+                        threading.Lock() for _ in range(DEFAULT_STRIPES)
+                    ]
+        return locks
+
+    def _lock(self, key) -> threading.Lock:
+        locks = self.__dict__.get("_locks") or self._stripes()
+        return locks[hash(key) % len(locks)]
+
+    def _hold(self, keys: Collection) -> _Held:
+        """
+        Stripes for all `keys`, acquired in a fixed order to avoid deadlocks.
+        """
+        locks = self.__dict__.get("_locks") or self._stripes()
+        n = len(locks)
+        if len(keys) >= n:
+            # A batch this wide touches most stripes anyway. Taking all of them
+            # skips hashing every key, which costs more than the extra locks.
+            return _Held(locks)
+        return _Held([locks[i] for i in sorted({hash(k) % n for k in keys})])
+
+    def _hold_all(self) -> _Held:
+        return _Held(self._stripes())
+
+    def snapshot(self) -> UtilDict:
+        """
+        Consistent shallow copy, as a plain UtilDict.
+        """
+        with self._hold_all():
+            new = UtilDict.__new__(UtilDict)
+            dict.update(new, dict.items(self))
+        return new
+
+    def __getitem__(self, key):
+        if isinstance(key, list):
+            with self._hold(key):
+                new = type(self).__new__(type(self))
+                dict.update(new, {k: dict.__getitem__(self, k) for k in key})
+            return new
+        with self._lock(key):
+            return dict.__getitem__(self, key)
+
+    def __setitem__(self, key, val):
+        if isinstance(key, (list, type(...))) or not isinstance(key, abc.Hashable):
+            # Multi-key assignments are applied in one atomic `update()`
+            return super().__setitem__(key, val)
+
+        with self._lock(key):
+            dict.__setitem__(self, key, val)
+
+    def __delitem__(self, key):
+        with self._lock(key):
+            dict.__delitem__(self, key)
+
+    def __contains__(self, key):
+        with self._lock(key):
+            return dict.__contains__(self, key)
+
+    def get(self, key, default=None):
+        with self._lock(key):
+            return dict.get(self, key, default)
+
+    def pop(self, key, *args):
+        with self._lock(key):
+            return dict.pop(self, key, *args)
+
+    def setdefault(self, key, default=None):
+        with self._lock(key):
+            return dict.setdefault(self, key, default)
+
+    def popitem(self):
+        with self._hold_all():
+            return dict.popitem(self)
+
+    def clear(self):
+        with self._hold_all():
+            dict.clear(self)
+
+    def update(self, *args, **kwargs):
+        items = dict(*args, **kwargs)
+        with self._hold(items):
+            dict.update(self, items)
+
+    def _update_existing(self, items):
+        items = dict(items)
+        with self._hold(items):
+            dict.update(
+                self, {k: v for k, v in items.items() if dict.__contains__(self, k)}
+            )
+
+    def drop(self, *keys, inplace=False):
+        if not inplace:
+            return super().drop(*keys)
+
+        if len(keys) == 1 and isinstance(keys[0], list):
+            keys = keys[0]
+
+        with self._hold(keys):
+            # Check every key first, so a missing key leaves self unchanged
+            for k in keys:
+                if not dict.__contains__(self, k):
+                    raise KeyError(k)
+            for k in keys:
+                dict.pop(self, k)
+
+    def _copy(self) -> ConcurrentUtilDict:
+        from copy import copy
+
+        with self._hold_all():
+            items = list(dict.items(self))
+        new = type(self).__new__(self.__class__)
+        new.__dict__["_locks"] = [threading.Lock() for _ in self._stripes()]
+        dict.update(new, {k: copy(v) for k, v in items})
+        return new
+
+    def __iter__(self):
+        with self._hold_all():
+            keys = list(dict.keys(self))
+        return iter(keys)
+
+    def keys(self):
+        return self.snapshot().keys()
+
+    def values(self):
+        return self.snapshot().values()
+
+    def items(self):
+        return self.snapshot().items()
+
+    def __eq__(self, other):
+        return dict.__eq__(self.snapshot(), other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None  # type:ignore
+
+
+if __name__ == "__main__":
+    from doctest import testmod
+
+    testmod()
@@ -0,0 +1,195 @@
+from __future__ import annotations
+import hashlib
+import pickle
+import sys
+from collections import abc
+from typing import Any, Dict, List, Optional, Tuple
+
+FingerprintCache = Dict[int, Tuple[Any, bytes]]
+
+DIGEST_SIZE = 16
+
+
+def fingerprint(obj: Any, cache: Optional[FingerprintCache] = None) -> bytes:
+    """
+    Content hash of a nested structure. Mappings are hashed from the
+    fingerprints of their keys and values, so equal trees give equal
+    fingerprints regardless of object identity or key order.
+
+    - DataFrames and Series are hashed from their values, index and dtypes,
+      using pandas' vectorized row hashing.
+    - Numpy arrays are hashed from their raw buffer, dtype and shape.
+    - Other values are hashed from their pickled bytes, or their `repr()`
+      if they can't be pickled.
+
+    Parameters
+    ----------
+    obj : Any
+        The structure to hash.
+    cache : dict, optional
+        Maps `id(subtree)` to its fingerprint. Reuse the same dict across calls
+        to skip re-hashing subtrees shared between trees, such as those reused
+        by `deep_merge()`. Cached subtrees are assumed to be unchanged, so
+        discard the cache after mutating a tree in place.
+
+    Examples
+    --------
+    >>> fingerprint({'a': [1, 2], 'b': {'c': 3}}) == fingerprint({'b': {'c': 3}, 'a': [1, 2]})
+    True
+    >>> fingerprint({'a': [1, 2]}) == fingerprint({'a': [2, 1]})
+    False
+    """
+    if cache is None:
+        cache = {}
+    return _fingerprint(obj, cache)
+
+
+def diff(old: abc.Mapping, new: abc.Mapping) -> Dict[str, List[tuple]]:
+    """
+    Compare two nested mappings, returning the key paths which were added,
+    removed, or changed.
+
+    Values which are the same object in both trees, such as subtrees shared
+    through `deep_merge()` or `copy()`, are skipped without being walked.
+    Other leaves are compared with `==`, falling back to their fingerprints
+    when that is not a plain True (e.g. DataFrames or NaN). Changes inside
+    nested mappings are reported at the deepest differing path.
+
+    Parameters
+    ----------
+    old, new : Mapping
+        The trees to compare.
+
+    Returns
+    -------
+    dict
+        `{'added': [...], 'removed': [...], 'changed': [...]}`, where each
+        entry is a tuple of keys leading from the root to the item.
+
+    Examples
+    --------
+    >>> old = {'a': 1, 'b': {'c': 2, 'd': 3}, 'e': 4}
+    >>> new = {'a': 1, 'b': {'c': 2, 'd': 30, 'f': 5}}
+    >>> diff(old, new)
+    {'added': [('b', 'f')], 'removed': [('e',)], 'changed': [('b', 'd')]}
+    """
+    # Only lives for this call, so nothing can change under it
+    cache: FingerprintCache = {}
+
+    added: List[tuple] = []
+    removed: List[tuple] = []
+    changed: List[tuple] = []
+
+    def compare(a: abc.Mapping, b: abc.Mapping, path: tuple):
+        for key, value in a.items():
+            if key not in b:
+                removed.append(path + (key,))
+                continue
+            other = b[key]
+            if value is other:
+                continue
+            if isinstance(value, abc.Mapping) and isinstance(other, abc.Mapping):
+                compare(value, other, path + (key,))
+            elif not _same_leaf(value, other, cache):
+                changed.append(path + (key,))
+
+        for key in b:
+            if key not in a:
+                added.append(path + (key,))
+
+    if old is not new:
+        compare(old, new, ())
+
+    return {"added": added, "removed": removed, "changed": changed}
+
+
+def _same_leaf(a: Any, b: Any, cache: FingerprintCache) -> bool:
+    if type(a) is type(b):
+        try:
+            if (a == b) is True:
+                return True
+        except Exception:
+            # Such as lists of DataFrames, whose truth value is ambiguous
+            pass
+    return _fingerprint(a, cache) == _fingerprint(b, cache)
+
+
+def _fingerprint(obj: Any, cache: FingerprintCache) -> bytes:
+    if isinstance(obj, abc.Mapping):
+        cached = cache.get(id(obj))
+        # The object is stored alongside its hash, so its id can't be reused
+        # by another object while the cache is alive.
+        if cached is not None and cached[0] is obj:
+            return cached[1]
+
+        # Sorted, so that mappings which compare equal hash equally
+        # regardless of insertion order.
+        items = sorted(
+            _fingerprint(key, cache) + _fingerprint(value, cache)
+            for key, value in obj.items()
+        )
+        h = hashlib.blake2b(b"map", digest_size=DIGEST_SIZE)
+        for item in items:
+            h.update(item)
+        digest = h.digest()
+        cache[id(obj)] = (obj, digest)
+        return digest
+
+    if isinstance(obj, (set, frozenset)):
+        # Sorted like mappings, since set iteration order varies between
+        # equal sets
+        h = hashlib.blake2b(b"set", digest_size=DIGEST_SIZE)
+        for digest in sorted(_fingerprint(item, cache) for item in obj):
+            h.update(digest)
+        return h.digest()
+
+    if isinstance(obj, (list, tuple)):
+        h = hashlib.blake2b(type(obj).__name__.encode(), digest_size=DIGEST_SIZE)
+        for item in obj:
+            h.update(_fingerprint(item, cache))
+        return h.digest()
+
+    return _leaf_digest(obj)
+
+
+def _leaf_digest(obj: Any) -> bytes:
+    h = hashlib.blake2b(digest_size=DIGEST_SIZE)
+
+    pd = sys.modules.get("pandas")
+    np = sys.modules.get("numpy")
+
+    if pd is not None and isinstance(obj, (pd.DataFrame, pd.Series)):
+        try:
+            hashed = pd.util.hash_pandas_object(obj, index=True).to_numpy()
+        except TypeError:
+            # Unhashable cells, such as lists. Hashed by pickle below.
+            hashed = None
+        if hashed is not None:
+            h.update(type(obj).__name__.encode())
+            if obj.ndim == 2:
+                h.update(repr((list(obj.columns), list(obj.dtypes))).encode())
+            else:
+                h.update(repr((obj.name, obj.dtype)).encode())
+            h.update(hashed.tobytes())
+            return h.digest()
+
+    if np is not None and isinstance(obj, np.ndarray) and not obj.dtype.hasobject:
+        h.update(b"ndarray")
+        h.update(str(obj.dtype).encode())
+        h.update(repr(obj.shape).encode())
+        # Viewed as bytes, since datetime buffers can't be exported directly
+        h.update(np.ascontiguousarray(obj).view(np.uint8))
+        return h.digest()
+
+    try:
+        h.update(pickle.dumps(obj, protocol=4))
+    except Exception:
+        h.update(type(obj).__qualname__.encode())
+        h.update(repr(obj).encode())
+    return h.digest()
+
+
+if __name__ == "__main__":
+    from doctest import testmod
+
+    testmod()
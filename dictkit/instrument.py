@@ -0,0 +1,123 @@
+"""
+Opt-in counters and timings for dictkit's hot paths.
+
+Instrumentation is off by default. Every hook checks the module-level
+`ENABLED` flag first, so the cost when disabled is a single attribute lookup.
+
+Recorded operations
+-------------------
+- `utildict.copy`: `UtilDict.copy()` calls. The counter `utildict.copy.values`
+  holds the number of values duplicated with `copy.copy`.
+- `categorize.level.<fields>`: time spent splitting each `categorize()` level.
+- `categorize.filter`: time spent filtering and copying each partition.
+  The counter `categorize.partitions` holds the number of partitions built.
+- `render`, `render.str`: total `render()` time, and time spent in `str()`
+  of leaf values.
+- `json`, `json.str`: total `UtilDict.json()` time, and time spent in `str()`
+  of non-serializable values.
+
+Examples
+--------
+>>> from dictkit import UtilDict
+>>> with instrument() as stats:
+...     _ = UtilDict(a=1, b=[2]).copy().drop('a')
+>>> stats()['counters']
+{'utildict.copy': 2, 'utildict.copy.values': 4}
+>>> sorted(stats()['timings']['utildict.copy'])
+['calls', 'total_s']
+
+Counters are not updated atomically, so totals may be slightly off when
+several threads are instrumented at once.
+"""
+from __future__ import annotations
+from contextlib import contextmanager
+from time import perf_counter
+from typing import Any, Callable, Dict, Iterator, List
+
+ENABLED = False
+
+_counters: Dict[str, int] = {}
+_timings: Dict[str, List[float]] = {}
+
+
+def enable() -> None:
+    global ENABLED
+    ENABLED = True
+
+
+def disable() -> None:
+    global ENABLED
+    ENABLED = False
+
+
+def reset() -> None:
+    _counters.clear()
+    _timings.clear()
+
+
+def stats() -> Dict[str, Dict[str, Any]]:
+    """
+    Snapshot of everything recorded so far, as plain dicts.
+    """
+    return {
+        "counters": dict(_counters),
+        "timings": {
+            name: {"calls": int(calls), "total_s": total}
+            for name, (calls, total) in _timings.items()
+        },
+    }
+
+
+@contextmanager
+def instrument(reset_stats: bool = True) -> Iterator[Callable[[], Dict]]:
+    """
+    Enable instrumentation inside the block. Yields `stats`, which remains
+    usable after the block exits. The previous enabled state is restored on exit.
+    """
+    global ENABLED
+    previous = ENABLED
+    if reset_stats:
+        reset()
+    ENABLED = True
+    try:
+        yield stats
+    finally:
+        ENABLED = previous
+
+
+def count(name: str, n: int = 1) -> None:
+    _counters[name] = _counters.get(name, 0) + n
+
+
+def record(name: str, seconds: float) -> None:
+    entry = _timings.get(name)
+    if entry is None:
+        _timings[name] = [1, seconds]
+    else:
+        entry[0] += 1
+        entry[1] += seconds
+
+
+class timer:
+    """
+    Context manager which records the time spent inside it under `name`.
+    Callers should check `ENABLED` before creating one.
+    """
+
+    __slots__ = ("name", "start")
+
+    def __init__(self, name: str):
+        self.name = name
+
+    def __enter__(self):
+        self.start = perf_counter()
+        return self
+
+    def __exit__(self, *exc):
+        record(self.name, perf_counter() - self.start)
+
+
+if __name__ == "__main__":
+    from doctest import testmod
+
+    testmod()
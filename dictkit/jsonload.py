@@ -0,0 +1,240 @@
+r"""
+Load JSON documents into UtilDict trees, optionally parsing large subtrees
+only when they are first accessed.
+
+The lazy scanner agrees with `json.loads` on strings containing escapes and
+brackets, and rejects what it rejects:
+
+>>> doc = b'{"a\\"b": "x}]\\"", "n": {"k": [1, {"s": "{["}]}, "e": {}}'
+>>> from_json(doc, lazy=1) == from_json(doc) == json.loads(doc)
+True
+>>> from_json(doc, lazy=1)['a"b']
+'x}]"'
+>>> bad = [b'{"a": 1,}', b'{"a" 1}', b'{"a": [1, 2}', b'{"a": 1', b'{"a": 1}}',
+...        b'{"a": 1} x', b'{"a":1,"b":{"c":2}} [1]', b'{"a": {"b": 1}}, "c": 2}',
+...        b'{"a": [1] x}', b'{"a" x: 1}', b'{"a": "s" x}', b'{x "a": 1}']
+>>> for doc in bad:
+...     try:
+...         from_json(doc, lazy=1)
+...     except ValueError:
+...         continue
+...     print('accepted', doc)
+
+Text-mode files are read by path or file object, lazily or not:
+
+>>> import tempfile
+>>> with tempfile.NamedTemporaryFile('w', suffix='.json', delete=False) as f:
+...     _ = f.write('{"big": {"a": [1, 2]}, "b": true}')
+>>> with open(f.name) as fp:
+...     tree = from_json(fp, lazy=8)
+>>> tree.is_loaded('big'), tree.big.a
+(False, [1, 2])
+>>> with open(f.name) as fp:
+...     from_json(fp) == tree == from_json(f.name, lazy=8)
+True
+>>> os.remove(f.name)
+"""
+from __future__ import annotations
+import json
+import mmap
+import os
+import re
+from typing import IO, Any, Optional, Type, Union
+
+from dictkit.lazy import Deferred, LazyUtilDict
+from dictkit.utildict import UtilDict
+
+# Subtrees at least this many bytes long are deferred when `lazy=True`
+DEFAULT_LAZY_BYTES = 64 * 1024
+
+# Strings (with escapes), and the punctuation that gives a document its structure.
+# Numbers, literals and whitespace between tokens are skipped over. Nested values
+# are skipped by matching brackets only.
+_STRING = rb'"[^"\\]*(?:\\.[^"\\]*)*"'
+_TOKEN = re.compile(_STRING + rb"|[{}\[\],:]", re.DOTALL)
+_BRACKET = re.compile(_STRING + rb"|[{}\[\]]", re.DOTALL)
+_WHITESPACE = b" \t\n\r"
+
+Source = Union[str, "os.PathLike[str]", bytes, bytearray, memoryview, mmap.mmap, IO]
+
+
+def from_json(
+    source: Source,
+    lazy: Union[bool, int] = False,
+    cls: Optional[Type[UtilDict]] = None,
+) -> Any:
+    """
+    Load a JSON document, building UtilDict nodes directly while parsing.
+
+    Parameters
+    ----------
+    source : path, file, bytes, or mmap
+        A path, an open file (text or binary), or a bytes-like buffer,
+        including `mmap.mmap`.
+    lazy : bool or int, default False
+        If False, the whole document is parsed in one pass.
+        If True or a number of bytes, objects are scanned for their keys only,
+        and any member value spanning at least that many bytes (default 64 KiB
+        for True) is parsed the first time it is accessed. Lazy objects are
+        returned as `LazyUtilDict`. Files are memory-mapped, so untouched
+        parts of the document are never read from disk.
+    cls : type, optional
+        UtilDict subclass for objects which are parsed fully. Defaults to UtilDict.
+
+    Examples
+    --------
+    >>> doc = b'{"name": "cfg", "big": {"a": [1, 2, 3], "b": {"c": null}}}'
+    >>> tree = from_json(doc, lazy=16)
+    >>> tree.is_loaded('name'), tree.is_loaded('big')
+    (True, False)
+    >>> tree.big.b
+    {
+       'c': None
+    }
+    >>> from_json(doc) == tree
+    True
+    """
+    cls = cls or UtilDict
+
+    def hook(pairs):
+        # Skips `__init__`, whose argument handling would copy each node again
+        new = cls.__new__(cls)
+        dict.update(new, pairs)
+        return new
+
+    if not lazy:
+        if isinstance(source, (str, os.PathLike)):
+            with open(source, "rb") as f:
+                return json.load(f, object_pairs_hook=hook)
+        if hasattr(source, "read"):
+            return json.load(source, object_pairs_hook=hook)  # type:ignore
+        return json.loads(bytes(source), object_pairs_hook=hook)  # type:ignore
+
+    threshold = DEFAULT_LAZY_BYTES if lazy is True else int(lazy)
+    buf = _buffer(source)
+
+    def parse(start: int, end: int) -> Any:
+        return json.loads(bytes(buf[start:end]), object_pairs_hook=hook)
+
+    def parse_object(start: int, end: int) -> LazyUtilDict:
+        # `start` is the position of "{", and `end` is just after its "}"
+        node = LazyUtilDict()
+        token = _expect(buf, start + 1, end, b'"}')
+        if token.group() == b"}":
+            return _closed(node, token, end)
+        while True:
+            key = json.loads(token.group())
+            token = _expect(buf, token.end(), end, b":")
+
+            value_start, _ = _strip(buf, token.end(), end)
+            first = buf[value_start : value_start + 1]
+            if first in (b"{", b"["):
+                value_end = _skip(buf, value_start, end)
+                token = _expect(buf, value_end, end, b",}")
+            else:
+                token = _expect(buf, value_start, end, b'",}', after_scalar=True)
+                if token.group()[:1] == b'"':
+                    token = _expect(buf, token.end(), end, b",}")
+                value_end = token.start()
+
+            value_start, value_end = _strip(buf, value_start, value_end)
+            span = (value_start, value_end)
+            if value_end - value_start < threshold:
+                value: Any = parse(*span)
+            elif first == b"{":
+                value = Deferred(lambda span=span: parse_object(*span))
+            else:
+                value = Deferred(lambda span=span: parse(*span))
+            dict.__setitem__(node, key, value)
+
+            if token.group() == b"}":
+                return _closed(node, token, end)
+            # A comma must be followed by another member
+            token = _expect(buf, token.end(), end, b'"')
+
+    start, end = _strip(buf, 3 if buf[:3] == b"\xef\xbb\xbf" else 0, len(buf))
+    if end - start < threshold or buf[start : start + 1] != b"{":
+        return parse(start, end)
+    return parse_object(start, end)
+
+
+def _closed(node: LazyUtilDict, token: re.Match, end: int) -> LazyUtilDict:
+    """
+    Check that the closing brace `token` ends the object's span.
+    """
+    if token.end() != end:
+        raise ValueError(f"Invalid JSON at byte {token.end()}: extra data")
+    return node
+
+
+def _expect(
+    buf, pos: int, end: int, allowed: bytes, after_scalar: bool = False
+) -> re.Match:
+    """
+    Next token after `pos`, which must start with one of the `allowed` bytes.
+    Only whitespace may come before it, unless `after_scalar` is set, in which
+    case the skipped bytes are a number or literal, checked when parsed.
+    """
+    match = _TOKEN.search(buf, pos, end)
+    if match is None or buf[match.start()] not in allowed:
+        found = "end of data" if match is None else repr(match.group()[:20])
+        raise ValueError(f"Invalid JSON at byte {pos}: unexpected {found}")
+    if not after_scalar and bytes(buf[pos : match.start()]).strip(_WHITESPACE):
+        raise ValueError(f"Invalid JSON at byte {pos}: unexpected data")
+    return match
+
+
+def _skip(buf, pos: int, end: int) -> int:
+    """
+    Position just after the object or array starting at `pos`.
+    """
+    depth = 0
+    for match in _BRACKET.finditer(buf, pos, end):
+        char = buf[match.start()]
+        if char == 0x22:  # '"'
+            continue
+        depth += 1 if char in (0x7B, 0x5B) else -1  # '{', '['
+        if depth == 0:
+            return match.end()
+    raise ValueError(f"Invalid JSON at byte {pos}: unterminated value")
+
+
+def _buffer(source: Source):
+    """
+    Bytes-like view of `source`, memory-mapping files where possible.
+    """
+    if isinstance(source, (bytes, bytearray, memoryview, mmap.mmap)):
+        return source
+    if isinstance(source, (str, os.PathLike)):
+        with open(source, "rb") as f:
+            return _map(f)
+
+    fileno = getattr(source, "fileno", None)
+    if fileno is not None:
+        try:
+            return _map(source)
+        except (OSError, ValueError):
+            pass
+    data = source.read()  # type:ignore
+    return data.encode() if isinstance(data, str) else data
+
+
+def _map(f) -> Any:
+    if os.fstat(f.fileno()).st_size == 0:
+        return b""
+    # The map holds its own handle, so the file can be closed afterwards
+    return mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+
+
+def _strip(buf, start: int, end: int):
+    while start < end and buf[start : start + 1] in _WHITESPACE:
+        start += 1
+    while end > start and buf[end - 1 : end] in _WHITESPACE:
+        end -= 1
+    return start, end
+
+
+if __name__ == "__main__":
+    from doctest import testmod
+
+    testmod()
@@ -0,0 +1,150 @@
+from __future__ import annotations
+from typing import Any, Callable
+
+from dictkit.utildict import UtilDict
+
+
+_PENDING = object()
+
+
+class Deferred:
+    """
+    Placeholder for a value that is produced on first access.
+    Holds a zero-argument callable which returns the real value. The result
+    is kept, so copies of a LazyUtilDict sharing a placeholder load it once.
+    """
+
+    __slots__ = ("loader", "value")
+
+    def __init__(self, loader: Callable[[], Any]):
+        self.loader = loader
+        self.value = _PENDING
+
+    def __call__(self) -> Any:
+        if self.value is _PENDING:
+            self.value = self.loader()
+            self.loader = None
+        return self.value
+
+    def __repr__(self):
+        return "<deferred>"
+
+
+class LazyUtilDict(UtilDict):
+    """
+    A UtilDict whose values may be `Deferred` placeholders. A placeholder is
+    resolved the first time its value is accessed, and the result replaces it,
+    so each value is loaded at most once.
+
+    Membership tests, `len()` and key iteration never resolve anything.
+    Accessing a single key only resolves that key. Accessing all values
+    (`values()`, `items()`, rendering, `json()`) resolves everything.
+
+    Examples
+    --------
+    >>> calls = []
+    >>> ld = LazyUtilDict(a=1, b=Deferred(lambda: calls.append('b') or 2))
+    >>> 'b' in ld, calls
+    (True, [])
+    >>> ld.b, calls
+    (2, ['b'])
+    >>> ld.b, calls
+    (2, ['b'])
+    >>> ld
+    {
+       'a': 1,
+       'b': 2
+    }
+
+    Dropping a key doesn't load its value.
+
+    >>> ld['c'] = Deferred(lambda: calls.append('c') or 3)
+    >>> ld.drop('c', inplace=True)
+    >>> 'c' in ld, calls
+    (False, ['b'])
+    """
+
+    def _resolve(self, key, value):
+        if isinstance(value, Deferred):
+            value = value()
+            dict.__setitem__(self, key, value)
+        return value
+
+    def _resolve_all(self):
+        for key, value in dict.items(self):
+            if isinstance(value, Deferred):
+                dict.__setitem__(self, key, value())
+
+    def __getitem__(self, key):
+        if isinstance(key, list):
+            new = type(self).__new__(type(self))
+            dict.update(new, {k: dict.__getitem__(self, k) for k in key})
+            return new
+        return self._resolve(key, dict.__getitem__(self, key))
+
+    def __iter__(self):
+        # Overriding `__iter__` stops `dict(self)` and `{**self}` from copying
+        # the raw placeholders, and routes them through `__getitem__` instead.
+        return dict.__iter__(self)
+
+    def get(self, key, default=None):
+        if key in self:
+            return self[key]
+        return default
+
+    def pop(self, key, *args):
+        value = dict.pop(self, key, *args)
+        return value() if isinstance(value, Deferred) else value
+
+    def popitem(self):
+        key, value = dict.popitem(self)
+        return key, value() if isinstance(value, Deferred) else value
+
+    def setdefault(self, key, default=None):
+        if key in self:
+            return self[key]
+        return dict.setdefault(self, key, default)
+
+    def values(self):
+        self._resolve_all()
+        return dict.values(self)
+
+    def items(self):
+        self._resolve_all()
+        return dict.items(self)
+
+    def __eq__(self, other):
+        self._resolve_all()
+        if isinstance(other, LazyUtilDict):
+            other._resolve_all()
+        return dict.__eq__(self, other)
+
+    def __ne__(self, other):
+        return not self == other
+
+    __hash__ = None  # type:ignore
+
+    def copy(self) -> LazyUtilDict:
+        from copy import copy
+
+        new = type(self).__new__(self.__class__)
+        dict.update(
+            new,
+            {
+                k: v if isinstance(v, Deferred) else copy(v)
+                for k, v in dict.items(self)
+            },
+        )
+        return new
+
+    def is_loaded(self, key) -> bool:
+        """
+        Whether the value at `key` has already been resolved.
+        """
+        return not isinstance(dict.__getitem__(self, key), Deferred)
+
+
+if __name__ == "__main__":
+    from doctest import testmod
+
+    testmod()
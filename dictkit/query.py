@@ -0,0 +1,174 @@
+from __future__ import annotations
+from collections import abc
+from typing import Any, Dict, Hashable, Iterable, List, Optional, Tuple
+
+from dictkit.utildict import UtilDict
+
+
+class KeyIndex:
+    """
+    Lookup tables for the keys of one mapping: each key's position, and for
+    namedtuple keys, a map from each field's values to the keys holding them.
+    Field tables are built the first time a field is queried.
+    """
+
+    def __init__(self, node: abc.Mapping):
+        self.keys: List = list(dict.keys(node) if isinstance(node, dict) else node)
+        self.positions: Dict[Hashable, int] = {k: i for i, k in enumerate(self.keys)}
+        self._fields: Dict[str, Dict[Any, List]] = {}
+
+    def field(self, name: str) -> Dict[Any, List]:
+        table = self._fields.get(name)
+        if table is None:
+            table = {}
+            for key in self.keys:
+                fields = getattr(key, "_fields", None)
+                if fields is None or name not in fields:
+                    continue
+                table.setdefault(getattr(key, name), []).append(key)
+            self._fields[name] = table
+        return table
+
+
+class TreeIndex:
+    """
+    `KeyIndex` for each node of a tree, built on first use.
+    Pass the same instance to several `select()` calls over an unchanged tree
+    to reuse the indexes. Discard it after adding or removing keys.
+    """
+
+    def __init__(self):
+        self._nodes: Dict[int, Tuple[abc.Mapping, KeyIndex]] = {}
+
+    def __getitem__(self, node: abc.Mapping) -> KeyIndex:
+        entry = self._nodes.get(id(node))
+        # Keeping the node alive keeps its id from being reused
+        if entry is None or entry[0] is not node:
+            entry = self._nodes[id(node)] = (node, KeyIndex(node))
+        return entry[1]
+
+
+def select(tree: abc.Mapping, *levels: Any, index: Optional[TreeIndex] = None):
+    """
+    Select branches of a nested mapping (such as a `categorize()` result),
+    with one condition per nesting level.
+
+    Returns a pruned tree of the same node types. Values are shared with
+    the original, not copied. Branches left without any matches are removed.
+
+    Each condition in `levels` can be:
+    - `None` or `...`: every key
+    - a set or list: these keys
+    - a callable: keys for which `fn(key)` is true
+    - a dict of namedtuple field names to a value, a set or list of values,
+      or a callable on the field's value. Keys must match every field.
+    - any other value: that single key
+
+    Sets and field conditions use the key index, so they jump directly to
+    matching keys. Callable conditions on fields are checked once per distinct
+    field value rather than once per key.
+
+    Parameters
+    ----------
+    tree : Mapping
+        The tree to select from.
+    *levels
+        Conditions for the first levels of the tree. Deeper levels are kept whole.
+    index : TreeIndex, optional
+        Reuse key indexes across calls.
+
+    Examples
+    --------
+    >>> from collections import namedtuple
+    >>> Key = namedtuple('Key', ['meat', 'state'])
+    >>> tree = UtilDict(
+    ...     red=UtilDict({Key('steak', 'ohio'): 1, Key('salmon', 'utah'): 2}),
+    ...     gray=UtilDict({Key('beef', 'ohio'): 3, Key('tilapia', 'iowa'): 4}),
+    ...     blue=UtilDict({Key('beef', 'utah'): 5}),
+    ... )
+    >>> select(tree, {'red', 'gray'}, {'meat': lambda meat: meat != 'beef'})
+    {
+       'red': {
+          Key(meat='steak', state='ohio'): 1,
+          Key(meat='salmon', state='utah'): 2
+       },
+       'gray': {
+          Key(meat='tilapia', state='iowa'): 4
+       }
+    }
+    >>> select(tree, None, {'state': 'utah'})
+    {
+       'red': {
+          Key(meat='salmon', state='utah'): 2
+       },
+       'blue': {
+          Key(meat='beef', state='utah'): 5
+       }
+    }
+    """
+    if index is None:
+        index = TreeIndex()
+
+    def matches(node: abc.Mapping, cond: Any) -> Iterable:
+        if cond is None or cond is ...:
+            return list(node)
+
+        if callable(cond):
+            return [k for k in node if cond(k)]
+
+        key_index = index[node]
+
+        if isinstance(cond, abc.Mapping):
+            found = None
+            for name, field_cond in cond.items():
+                table = key_index.field(name)
+                if callable(field_cond):
+                    values = [v for v in table if field_cond(v)]
+                elif isinstance(field_cond, (set, frozenset, list)):
+                    values = field_cond
+                else:
+                    values = [field_cond]
+                keys = {k for v in values for k in table.get(v, ())}
+                found = keys if found is None else found & keys
+                if not found:
+                    return []
+        elif isinstance(cond, (set, frozenset, list)):
+            found = [k for k in cond if k in key_index.positions]
+        else:
+            found = [cond] if cond in key_index.positions else []
+
+        return sorted(found, key=key_index.positions.__getitem__)
+
+    def prune(node: abc.Mapping, depth: int):
+        items = []
+        last = depth + 1 == len(levels)
+        for key in matches(node, levels[depth]):
+            if last and isinstance(node, dict):
+                # Read raw, so lazily loaded leaves stay unloaded
+                value = dict.__getitem__(node, key)
+            else:
+                value = node[key]
+            if not last and isinstance(value, abc.Mapping):
+                value = prune(value, depth + 1)
+                if not value:
+                    continue
+            items.append((key, value))
+        return _new_like(node, items)
+
+    if not levels:
+        return _new_like(tree, list(tree.items()))
+    return prune(tree, 0)
+
+
+def _new_like(node: abc.Mapping, items: List[tuple]) -> abc.Mapping:
+    if isinstance(node, UtilDict):
+        new = type(node).__new__(type(node))
+        dict.update(new, items)
+        return new
+    return dict(items)
+
+
+if __name__ == "__main__":
+    from doctest import testmod
+
+    testmod()
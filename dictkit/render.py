@@ -1,7 +1,8 @@
 from __future__ import annotations
-import re
 from typing import Any, Literal, Union, List, Dict, Tuple, Optional
 
+from dictkit import instrument as _instrument
+
 QuoteOption = Union[bool, Literal["keys"], Literal["values"]]
 
 def render(
@@ -153,6 +154,17 @@ def render(
     <BLANKLINE>
     ]
     """
+    if _instrument.ENABLED:
+        with _instrument.timer("render"):
+            return _render_obj(obj, indent, quote, line_spacing, shift)
+    return _render_obj(obj, indent, quote, line_spacing, shift)
+
+
+def _render_obj(
+    obj, indent: int, quote: QuoteOption, line_spacing, shift
+) -> FormattedReprStr:
+    import re
+
     if isinstance(quote, bool):
         quote_keys, quote_values = quote, quote
     else:
@@ -218,6 +230,9 @@ def fmt(obj, quote=True) -> str:
     if isinstance(obj, str):
         if not obj or quote:
             return "'" + obj + "'"
+    if _instrument.ENABLED:
+        with _instrument.timer("render.str"):
+            return str(obj)
     return str(obj)
 
 
@@ -0,0 +1,229 @@
+from __future__ import annotations
+from bisect import bisect_left, bisect_right
+from collections import abc
+from typing import Any, List
+
+from dictkit.utildict import UtilDict
+
+
+class SortedUtilDict(UtilDict):
+    """
+    A UtilDict which keeps its keys in sorted order as they change.
+
+    Keys are held in a sorted list alongside the dict, so lookups by key stay
+    O(1), and ordered operations use binary search instead of a full sort.
+    Finding where a key goes is O(log n). Inserting or removing it shifts the
+    rest of the list, which is O(n), though only a fast memory move.
+    Iteration, rendering and `json()` follow key order.
+
+    - Range slicing: `sd['b':'d']` -> items with keys from 'b' to 'd', inclusive
+      of both ends (like `DataFrame.loc`)
+    - Nearest keys: `sd.floor(key)`, `sd.ceil(key)`
+    - First or last n items: `sd.head(n)`, `sd.tail(n)`
+
+    All keys must be comparable with each other.
+
+    Examples
+    --------
+    >>> sd = SortedUtilDict({'2024-03': 3, '2024-01': 1, '2024-05': 5})
+    >>> sd['2024-04'] = 4
+    >>> sd
+    {
+       '2024-01': 1,
+       '2024-03': 3,
+       '2024-04': 4,
+       '2024-05': 5
+    }
+    >>> sd['2024-02':'2024-04']
+    {
+       '2024-03': 3,
+       '2024-04': 4
+    }
+    >>> sd.floor('2024-02'), sd.ceil('2024-02')
+    ('2024-01', '2024-03')
+    >>> list(sd.tail(2))
+    ['2024-04', '2024-05']
+    >>> sd |= {'2023-12': 0}
+    >>> list(sd.head(2))
+    ['2023-12', '2024-01']
+
+    Keys which can't be sorted with the others are rejected without any change
+
+    >>> sd.update({2024: 0})
+    Traceback (most recent call last):
+    ...
+    TypeError: '<' not supported between instances of 'int' and 'str'
+    >>> 2024 in sd, len(sd) == len(list(sd))
+    (False, True)
+    """
+
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.__dict__["_keys"] = sorted(dict.keys(self))
+
+    def __setstate__(self, state):
+        # Defined so unpickling doesn't fall through to `UtilDict.__getattr__`
+        self.__dict__.update(state)
+
+    def _index(self) -> List:
+        # Instances made with `__new__` (copies, subsets) build their index on
+        # first use.
+        keys = self.__dict__.get("_keys")
+        if keys is None:
+            keys = self.__dict__["_keys"] = sorted(dict.keys(self))
+        return keys
+
+    def _insert(self, key) -> None:
+        keys = self._index()
+        i = bisect_left(keys, key)
+        if i == len(keys) or keys[i] != key:
+            keys.insert(i, key)
+
+    def _remove(self, key) -> None:
+        keys = self._index()
+        i = bisect_left(keys, key)
+        if i < len(keys) and keys[i] == key:
+            del keys[i]
+
+    def _subset(self, keys: List) -> SortedUtilDict:
+        new = type(self).__new__(type(self))
+        dict.update(new, ((k, dict.__getitem__(self, k)) for k in keys))
+        new.__dict__["_keys"] = keys
+        return new
+
+    def __setitem__(self, key, val):
+        if isinstance(key, (list, type(...))) or not isinstance(key, abc.Hashable):
+            # Multi-key assignments go through `update()`
+            return super().__setitem__(key, val)
+
+        # Find the position first, so unsortable keys fail before any change
+        self._insert(key)
+        super().__setitem__(key, val)
+
+    def __getitem__(self, key):
+        if not isinstance(key, slice):
+            return super().__getitem__(key)
+
+        if key.step is not None:
+            raise ValueError("Slicing by key does not support a step")
+
+        keys = self._index()
+        lo = 0 if key.start is None else bisect_left(keys, key.start)
+        hi = len(keys) if key.stop is None else bisect_right(keys, key.stop)
+        return self._subset(keys[lo:hi])
+
+    def __delitem__(self, key):
+        super().__delitem__(key)
+        self._remove(key)
+
+    def pop(self, key, *args):
+        if key not in self:
+            return super().pop(key, *args)
+        self._remove(key)
+        return super().pop(key)
+
+    def popitem(self):
+        """
+        Remove and return the item with the largest key.
+        """
+        keys = self._index()
+        if not keys:
+            raise KeyError("popitem(): dictionary is empty")
+        key = keys.pop()
+        return key, dict.pop(self, key)
+
+    def setdefault(self, key, default=None):
+        if key not in self:
+            self[key] = default
+        return dict.__getitem__(self, key)
+
+    def update(self, *args, **kwargs):
+        items = dict(*args, **kwargs)
+        keys = self._index()
+        added = [k for k in items if k not in self]
+        if not added:
+            dict.update(self, items)
+            return
+
+        # Build the new index before changing anything, so unsortable keys
+        # fail with the dict and its index still in agreement
+        if len(added) * 8 > len(keys):
+            # Cheaper to re-sort everything than to insert many keys one by one
+            new_keys = sorted(keys + added)
+        else:
+            new_keys = list(keys)
+            for k in added:
+                new_keys.insert(bisect_left(new_keys, k), k)
+
+        dict.update(self, items)
+        self.__dict__["_keys"] = new_keys
+
+    def __or__(self, other):
+        if not isinstance(other, abc.Mapping):
+            return NotImplemented
+        new = self.copy()
+        new.update(other)
+        return new
+
+    def __ior__(self, other):
+        # `dict.__ior__` would add keys without indexing them
+        self.update(other)
+        return self
+
+    def clear(self):
+        super().clear()
+        self.__dict__["_keys"] = []
+
+    def __iter__(self):
+        return iter(list(self._index()))
+
+    def __reversed__(self):
+        return reversed(list(self._index()))
+
+    def keys(self):
+        return abc.KeysView(self)
+
+    def values(self):
+        return abc.ValuesView(self)
+
+    def items(self):
+        return abc.ItemsView(self)
+
+    def floor(self, key) -> Any:
+        """
+        Largest key less than or equal to `key`.
+        """
+        keys = self._index()
+        i = bisect_right(keys, key)
+        if i == 0:
+            raise KeyError(f"No key <= {key!r}")
+        return keys[i - 1]
+
+    def ceil(self, key) -> Any:
+        """
+        Smallest key greater than or equal to `key`.
+        """
+        keys = self._index()
+        i = bisect_left(keys, key)
+        if i == len(keys):
+            raise KeyError(f"No key >= {key!r}")
+        return keys[i]
+
+    def head(self, n: int = 5) -> SortedUtilDict:
+        """
+        Items with the `n` smallest keys.
+        """
+        return self._subset(self._index()[:n])
+
+    def tail(self, n: int = 5) -> SortedUtilDict:
+        """
+        Items with the `n` largest keys.
+        """
+        keys = self._index()
+        return self._subset(keys[max(len(keys) - n, 0):])
+
+
+if __name__ == "__main__":
+    from doctest import testmod
+
+    testmod()
@@ -0,0 +1,260 @@
+from __future__ import annotations
+import os
+import pickle
+import shutil
+import tempfile
+from collections import namedtuple
+from typing import Any, Dict, Mapping, Tuple, Union
+
+from dictkit.lazy import Deferred, LazyUtilDict
+from dictkit.utildict import UtilDict
+
+PathLike = Union[str, "os.PathLike[str]"]
+
+INDEX_FILE = "index.pkl"
+LEAF_DIR = "leaves"
+FORMAT_VERSION = 1
+
+
+def save(tree: Mapping, path: PathLike, overwrite: bool = False) -> None:
+    """
+    Save a nested mapping (such as a `categorize()` result) to a directory.
+
+    The key tree is written to a small index file. Large leaves are written
+    to their own files, so they can be read independently of each other.
+
+    - DataFrames are written as uncompressed Arrow IPC (Feather V2) files
+      when `pyarrow` is installed. They are pickled otherwise, or when Arrow
+      can't represent a column (such as objects of mixed types).
+    - Numeric numpy arrays are written as `.npy` files.
+    - Series are pickled to their own file.
+    - Any other value is stored inline in the index.
+
+    Namedtuple keys (like the `Key` objects from `categorize()`) are stored by
+    their type name, fields and values, and rebuilt on load.
+
+    Parameters
+    ----------
+    tree : Mapping
+        The nested mapping to save.
+    path : str or PathLike
+        Directory to write to. It will be created if it does not exist.
+    overwrite : bool, default False
+        Allow writing to a directory which already contains a saved tree.
+
+    Examples
+    --------
+    >>> import tempfile, numpy as np
+    >>> tree = UtilDict(a=UtilDict(x=np.arange(3)), b='text')
+    >>> with tempfile.TemporaryDirectory() as tmp:
+    ...     save(tree, tmp)
+    ...     loaded = load(tmp)
+    ...     loaded.a.is_loaded('x')
+    ...     loaded.a.x.tolist()
+    ...     loaded.b
+    False
+    [0, 1, 2]
+    'text'
+    """
+    path = os.fspath(path)
+    index_path = os.path.join(path, INDEX_FILE)
+    leaf_dir = os.path.join(path, LEAF_DIR)
+
+    if os.path.exists(index_path) and not overwrite:
+        raise FileExistsError(f"A saved tree already exists at {path}")
+
+    # Leaves are written to a new directory, which replaces the old one once
+    # complete. Files from an earlier save don't linger, and a failed save
+    # leaves the previous tree intact.
+    os.makedirs(path, exist_ok=True)
+    new_leaf_dir = tempfile.mkdtemp(prefix=f".{LEAF_DIR}-", dir=path)
+    try:
+        index = _write_tree(tree, new_leaf_dir)
+        with open(index_path + ".tmp", "wb") as f:
+            pickle.dump(index, f, protocol=pickle.HIGHEST_PROTOCOL)
+    except BaseException:
+        shutil.rmtree(new_leaf_dir, ignore_errors=True)
+        raise
+
+    if os.path.exists(leaf_dir):
+        shutil.rmtree(leaf_dir)
+    os.rename(new_leaf_dir, leaf_dir)
+    os.replace(index_path + ".tmp", index_path)
+
+
+def _write_tree(tree: Mapping, leaf_dir: str) -> dict:
+    counter = [0]
+
+    def leaf_path(ext: str) -> str:
+        name = f"{counter[0]}.{ext}"
+        counter[0] += 1
+        return name
+
+    def encode(node: Any) -> tuple:
+        if isinstance(node, Mapping):
+            return (
+                "tree",
+                [(_encode_key(k), encode(v)) for k, v in node.items()],
+            )
+        return _write_leaf(node, leaf_dir, leaf_path)
+
+    return {"version": FORMAT_VERSION, "root": encode(tree)}
+
+
+def load(
+    path: PathLike, lazy: bool = True, mmap: bool = True
+) -> Union[LazyUtilDict, UtilDict]:
+    """
+    Load a tree written by `save()`.
+
+    Only the index is read up front. With `lazy=True`, each leaf file is read
+    the first time its value is accessed, so opening a large tree is fast and
+    untouched branches are never read.
+
+    Parameters
+    ----------
+    path : str or PathLike
+        Directory passed to `save()`.
+    lazy : bool, default True
+        Defer reading each leaf until first access. Nodes are returned as
+        `LazyUtilDict`. If False, all leaves are read immediately, and nodes
+        are returned as `UtilDict`.
+    mmap : bool, default True
+        Memory-map leaf files. `.npy` arrays stay memory-mapped (read-only),
+        so only the pages actually used are read from disk. DataFrames from
+        Arrow files keep numeric columns without nulls backed by the mapping.
+        Other columns, such as strings, are converted into memory.
+
+    Notes
+    -----
+    The index is a pickle file. Only load trees from sources you trust.
+    """
+    path = os.fspath(path)
+    leaf_dir = os.path.join(path, LEAF_DIR)
+
+    with open(os.path.join(path, INDEX_FILE), "rb") as f:
+        index = pickle.load(f)
+
+    if index.get("version") != FORMAT_VERSION:
+        raise ValueError(f"Unsupported format version: {index.get('version')}")
+
+    node_cls = LazyUtilDict if lazy else UtilDict
+
+    def decode(node: tuple) -> Any:
+        kind = node[0]
+        if kind == "tree":
+            new = node_cls.__new__(node_cls)
+            dict.update(new, ((_decode_key(k), decode(v)) for k, v in node[1]))
+            return new
+
+        if kind == "value":
+            return node[1]
+
+        loader = _leaf_loader(node, leaf_dir, mmap)
+        return Deferred(loader) if lazy else loader()
+
+    return decode(index["root"])
+
+
+def _write_leaf(value: Any, leaf_dir: str, leaf_path) -> tuple:
+    import sys
+
+    # Only check for array types when their libraries are already in use.
+    # Values can't be instances of a library which was never imported.
+    pd = sys.modules.get("pandas")
+    np = sys.modules.get("numpy")
+
+    if pd is not None and isinstance(value, pd.DataFrame):
+        try:
+            import pyarrow as pa
+            from pyarrow import feather
+        except ImportError:
+            pa = None
+
+        if pa is not None:
+            name = leaf_path("arrow")
+            file = os.path.join(leaf_dir, name)
+            try:
+                feather.write_feather(value, file, compression="uncompressed")
+                return ("frame", name, "arrow")
+            except (pa.ArrowInvalid, pa.ArrowTypeError, pa.ArrowNotImplementedError):
+                # Columns Arrow can't represent, such as mixed-type objects
+                if os.path.exists(file):
+                    os.remove(file)
+
+    if pd is not None and isinstance(value, (pd.DataFrame, pd.Series)):
+        name = leaf_path("pkl")
+        value.to_pickle(os.path.join(leaf_dir, name))
+        return ("frame", name, "pickle")
+
+    if np is not None and isinstance(value, np.ndarray) and not value.dtype.hasobject:
+        name = leaf_path("npy")
+        np.save(os.path.join(leaf_dir, name), value, allow_pickle=False)
+        return ("array", name)
+
+    return ("value", value)
+
+
+def _leaf_loader(node: tuple, leaf_dir: str, mmap: bool):
+    kind, name = node[0], node[1]
+    file = os.path.join(leaf_dir, name)
+
+    if kind == "array":
+
+        def load_array():
+            import numpy as np
+
+            return np.load(file, mmap_mode="r" if mmap else None)
+
+        return load_array
+
+    if kind == "frame" and node[2] == "arrow":
+
+        def load_arrow():
+            from pyarrow import feather
+
+            table = feather.read_table(file, memory_map=mmap)
+            # One block per column lets numeric columns without nulls wrap the
+            # mapped buffers instead of being copied into a consolidated block
+            return table.to_pandas(split_blocks=True, self_destruct=False)
+
+        return load_arrow
+
+    if kind == "frame":
+
+        def load_pickle():
+            import pandas as pd
+
+            return pd.read_pickle(file)
+
+        return load_pickle
+
+    raise ValueError(f"Unknown leaf kind: {kind}")
+
+
+_key_classes: Dict[Tuple[str, Tuple[str, ...]], type] = {}
+
+
+def _encode_key(key: Any) -> tuple:
+    # Namedtuple classes made at runtime (like categorize's `Key`) can't be
+    # pickled by reference, so store their structure instead.
+    if isinstance(key, tuple) and hasattr(key, "_fields"):
+        return ("nt", type(key).__name__, tuple(key._fields), tuple(key))
+    return ("k", key)
+
+
+def _decode_key(encoded: tuple) -> Any:
+    if encoded[0] == "k":
+        return encoded[1]
+
+    _, name, fields, values = encoded
+    cls = _key_classes.get((name, fields))
+    if cls is None:
+        cls = _key_classes[(name, fields)] = namedtuple(name, fields)
+    return cls(*values)
+
+
+if __name__ == "__main__":
+    from doctest import testmod
+
+    testmod()
@@ -11,8 +11,12 @@ from typing import (
     Dict,
     List,
     Any,
+    Callable,
 )
 from copy import copy
+from itertools import repeat
+
+from dictkit import instrument as _instrument
 
 
 def is_valid_normal_iterable(item) -> bool:
@@ -29,6 +33,31 @@ def is_valid_normal_iterable(item) -> bool:
     return True
 
 
+def _as_list(items: Iterable) -> list:
+    if isinstance(items, list):
+        return items
+    if hasattr(items, "tolist"):
+        # Arrays, Series and Index convert to a list much faster in C
+        return items.tolist()
+    return list(items)
+
+
+def _shallow_copy(node: Mapping) -> Mapping:
+    """
+    New mapping of the same type, whose values are the same objects as in `node`.
+    """
+    if isinstance(node, UtilDict):
+        new = type(node).__new__(type(node))
+        # `dict.items` reads raw values, without triggering any subclass hooks
+        new.update(dict.items(node))
+        return new
+    return dict(node)
+
+
+MergeStrategy = Union[
+    Literal["replace", "keep", "concat"], Callable[[tuple, Any, Any], Any]
+]
+
 # Key-value types of current object
 K = TypeVar("K")
 V = TypeVar("V")
@@ -53,6 +82,8 @@ class UtilDict(Dict[K, V]):
 
     Set same value to multiple items: `my_dict[['a', 'b']] = 10`
 
+    Set many items from arrays or iterables: `my_dict.set_many(keys, values)`
+
     Add items, while returning a modified copy of self
       - `my_dict.add(a=5)` -> {<existing key/values>, 'a': 5}
 
@@ -247,11 +278,126 @@ class UtilDict(Dict[K, V]):
                 keys = keys[0]
 
         for k in keys:
-            new.pop(k)
+            del new[k]
 
         if not inplace:
             return new
 
+    def deep_merge(
+        self,
+        *others: Union[Mapping, Iterable],
+        strategy: Union[MergeStrategy, Mapping[tuple, MergeStrategy]] = "replace",
+        **kwargs,
+    ) -> UtilDict:
+        """
+        Recursively merge other trees into a copy of self, returning the copy.
+
+        Only the nodes along paths present in `others` are copied. Every other
+        subtree, and every value taken from `others`, is shared by reference
+        with its source. The cost scales with the size of `others`, not self.
+
+        Parameters
+        ----------
+        *others
+            Trees to merge in, in order. Accepts the same argument types as
+            the constructor.
+        **kwargs
+            Key-value pairs to merge in, after `others`.
+        strategy : str, callable, or dict, default 'replace'
+            How to resolve a key present in both trees, when the two values
+            are not both mappings:
+            - 'replace': take the value from `others`
+            - 'keep': keep the value from self
+            - 'concat': concatenate lists or tuples, otherwise replace
+            - callable: `fn(path, old, new)` returning the merged value
+            A dict maps key paths (tuples) to any of the above, with 'replace'
+            used for paths not listed. A callable given for a specific path
+            also receives mappings, instead of merging them recursively.
+
+        Examples
+        --------
+        >>> base = UtilDict(db=UtilDict(host='localhost', port=5432), tags=['a'], debug=False)
+        >>> merged = base.deep_merge({'db': {'port': 6543}, 'tags': ['b']}, strategy='concat')
+        >>> merged
+        {
+           'db': {
+              'host': 'localhost',
+              'port': 6543
+           },
+           'tags': [
+              'a',
+              'b'
+           ],
+           'debug': False
+        }
+        >>> base.db.port
+        5432
+
+        Subtrees untouched by the merge are shared, not copied
+        >>> merged = base.deep_merge(debug=True)
+        >>> merged.db is base.db
+        True
+
+        Per-path strategies
+        >>> merged = base.deep_merge(
+        ...     {'db': {'port': 1}, 'debug': True},
+        ...     strategy={('db', 'port'): lambda path, old, new: old + new},
+        ... )
+        >>> merged.db.port, merged.debug
+        (5433, True)
+        """
+        # Nodes copied during this merge. They can be modified directly,
+        # since nothing else references them.
+        owned = set()
+
+        def resolver(path: tuple) -> Optional[MergeStrategy]:
+            if isinstance(strategy, abc.Mapping):
+                return strategy.get(path)
+            return strategy
+
+        def resolve(path: tuple, old: Any, new: Any) -> Any:
+            how = resolver(path) or "replace"
+            if callable(how):
+                return how(path, old, new)
+            if how == "keep":
+                return old
+            if how == "concat":
+                if isinstance(old, list) and isinstance(new, list):
+                    return old + new
+                if isinstance(old, tuple) and isinstance(new, tuple):
+                    return old + new
+                return new
+            if how == "replace":
+                return new
+            raise ValueError(f"Unknown merge strategy: {how}")
+
+        def merge(node, overlay: Mapping, path: tuple):
+            for k, v in overlay.items():
+                p = path + (k,)
+                if k not in node:
+                    node[k] = v
+                    continue
+
+                old = node[k]
+                if (
+                    isinstance(old, abc.Mapping)
+                    and isinstance(v, abc.Mapping)
+                    and not callable(resolver(p))
+                ):
+                    if id(old) not in owned:
+                        old = _shallow_copy(old)
+                        owned.add(id(old))
+                        node[k] = old
+                    merge(old, v, p)
+                else:
+                    node[k] = resolve(p, old, v)
+
+        new = _shallow_copy(self)
+        for other in others:
+            merge(new, self._iterable_to_dict(other), ())
+        merge(new, kwargs, ())
+        return new
+
     @overload
     def deep_uniform(self, reverse: Optional[Literal[False]] = False) -> UtilDict[K, V]:
         ...
@@ -292,31 +438,113 @@ class UtilDict(Dict[K, V]):
         return self.__getitem__(k)
 
     def __setitem__(self, key, val):
-        special_key_types = (list, type(...))
-        if not isinstance(key, special_key_types):
+        # Plain single keys first, with the cheapest checks
+        if type(key).__hash__ is not None and not isinstance(key, type(...)):
             return super().__setitem__(key, val)
 
         if isinstance(key, type(...)):
             if isinstance(val, dict):
-                for k, v in val.items():
-                    super().__setitem__(k, v)
+                self.update(val)
                 return
             raise ValueError(val)
 
-        assert isinstance(key, list), type(key)
-
+        if not isinstance(key, list):
+            if not is_valid_normal_iterable(key):
+                return super().__setitem__(key, val)
+            # Unhashable sequences of keys, like arrays, Series and Index.
+            # Converted like `set_many()`, so arrays give the same key types.
+            key = _as_list(key)
+
+        # The same rules for every key container: tuples and iterators are
+        # assigned elementwise, and anything else is copied to every key.
+        # Columnar value sources are left to the explicit `set_many()`.
         if isinstance(val, tuple):
-            if len(val) == len(key):
-                for k, v in zip(key, val):
-                    super().__setitem__(k, v)
-            else:
+            if len(val) != len(key):
                 raise ValueError(
                     "Number of values assigned must equal number of keys assigning to"
                 )
-            return
+            self.update(zip(key, val))
+        elif isinstance(val, abc.Iterator):
+            self.set_many(key, val)
+        else:
+            self.update(zip(key, map(copy, repeat(val, len(key)))))
+
+    def set_many(
+        self,
+        keys: Union[Iterable, Mapping],
+        values: Any = None,
+        copy_values: bool = False,
+        existing_only: bool = False,
+    ) -> None:
+        """
+        Assign many keys at once, from columnar data or any iterables.
 
-        for k in key:
-            super().__setitem__(k, copy(val))
+        Lengths are checked once, and all items are applied in a single
+        `update()`.
+
+        Parameters
+        ----------
+        keys : iterable or Mapping
+            Keys to assign to. Arrays, Series and Index are accepted. If a
+            mapping is given and `values` is None, its items are assigned.
+        values : iterable or scalar, optional
+            One value per key, from any iterable (including arrays, Series and
+            generators). Arrays and Series are converted with `tolist()`.
+            Strings, mappings and other non-iterables are assigned to every key.
+        copy_values : bool, default False
+            Assign a copy of each value, instead of the value itself.
+        existing_only : bool, default False
+            Only assign keys which are already present, ignoring the rest.
+
+        Examples
+        --------
+        >>> sd = UtilDict(a=1, b=2)
+        >>> sd.set_many(['a', 'b', 'c'], (x * 10 for x in range(3)))
+        >>> sd
+        {
+           'a': 0,
+           'b': 10,
+           'c': 20
+        }
+        >>> sd.set_many(['b', 'z'], [-1, -1], existing_only=True)
+        >>> sd
+        {
+           'a': 0,
+           'b': -1,
+           'c': 20
+        }
+
+        Assignments through subscripting assign tuples and iterators
+        elementwise, whatever the key container. Any other value, including a
+        list or array, is assigned to every key.
+        >>> sd[['a', 'b']] = iter(['x', 'y'])
+        >>> sd.a, sd.b
+        ('x', 'y')
+        """
+        if values is None and isinstance(keys, abc.Mapping):
+            keys, values = list(keys.keys()), list(keys.values())
+        else:
+            keys = _as_list(keys)
+            if is_valid_normal_iterable(values):
+                values = _as_list(values)
+                if len(values) != len(keys):
+                    raise ValueError(
+                        "Number of values assigned must equal number of keys assigning to"
+                    )
+            else:
+                values = [values] * len(keys)
+
+        if copy_values:
+            values = [copy(v) for v in values]
+
+        if existing_only:
+            self._update_existing(zip(keys, values))
+        else:
+            self.update(zip(keys, values))
+
+    def _update_existing(self, items: Iterable[tuple]) -> None:
+        # Separate, so subclasses can check and assign under one lock
+        self.update([(k, v) for k, v in items if k in self])
 
     @overload
     def __getitem__(self, key: K) -> V:
@@ -337,6 +565,14 @@ class UtilDict(Dict[K, V]):
         return new
 
     def copy(self) -> UtilDict:
+        if _instrument.ENABLED:
+            _instrument.count("utildict.copy")
+            _instrument.count("utildict.copy.values", len(self))
+            with _instrument.timer("utildict.copy"):
+                return self._copy()
+        return self._copy()
+
+    def _copy(self) -> UtilDict:
         new = type(self).__new__(self.__class__)
         new.update({k: copy(v) for k, v in self.items()})
         return new
@@ -396,11 +632,93 @@ class UtilDict(Dict[K, V]):
             if isinstance(obj, abc.Mapping):
                 return {k: format(v) for k, v in obj.items()}
 
+            if _instrument.ENABLED:
+                with _instrument.timer("json.str"):
+                    return str(obj)
             return str(obj)
 
+        if _instrument.ENABLED:
+            with _instrument.timer("json"):
+                return json.dumps(format(self), indent=indent, **kwargs)
+
         formatted_obj = format(self)
         return json.dumps(formatted_obj, indent=indent, **kwargs)
 
+    def fingerprint(self, cache: Optional[dict] = None) -> str:
+        """
+        Hex content hash of the whole tree. Equal trees give equal fingerprints.
+        See `dictkit.fingerprint.fingerprint`.
+        """
+        from dictkit.fingerprint import fingerprint
+
+        return fingerprint(self, cache).hex()
+
+    def diff(self, other: Mapping) -> UtilDict:
+        """
+        Key paths added, removed, or changed in `other`, relative to self.
+        Subtrees shared by both trees are skipped without being walked.
+        See `dictkit.fingerprint.diff`.
+
+        Examples
+        --------
+        >>> old = UtilDict(a=1, b=UtilDict(c=2, d=3))
+        >>> changes = old.diff(old.add(a=10, e=5))
+        >>> changes.added, changes.removed, changes.changed
+        ([('e',)], [], [('a',)])
+        """
+        from dictkit.fingerprint import diff
+
+        return UtilDict(diff(self, other))
+
+    def select(self, *levels, **kwargs) -> UtilDict:
+        """
+        Select branches with one condition per nesting level, returning a
+        pruned tree which shares values with self. See `dictkit.query.select`.
+
+        Examples
+        --------
+        >>> tree = UtilDict(red=UtilDict(steak=1, beef=2), gray=UtilDict(beef=3), blue=UtilDict(tuna=4))
+        >>> tree.select({'red', 'gray'}, lambda meat: meat != 'beef')
+        {
+           'red': {
+              'steak': 1
+           }
+        }
+        """
+        from dictkit.query import select
+
+        return select(self, *levels, **kwargs)
+
+    def save(self, path, **kwargs) -> None:
+        """
+        Save to a directory, with large leaves in separate files.
+        See `dictkit.store.save`.
+        """
+        from dictkit.store import save
+
+        save(self, path, **kwargs)
+
+    @staticmethod
+    def load(path, **kwargs) -> UtilDict:
+        """
+        Load a tree written by `save()`, reading leaves on first access.
+        See `dictkit.store.load`.
+        """
+        from dictkit.store import load
+
+        return load(path, **kwargs)
+
+    @classmethod
+    def from_json(cls, source, lazy=False) -> Any:
+        """
+        Parse JSON from a path, file or buffer straight into nodes of this class.
+        With `lazy`, large subtrees are parsed on first access.
+        See `dictkit.jsonload.from_json`.
+        """
+        from dictkit.jsonload import from_json
+
+        return from_json(source, lazy=lazy, cls=cls)
+
     def __repr__(self):
         return self.render()
 